@@ -1,13 +1,14 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from typing import List, Dict, Any
+from typing import List, Dict, Any, BinaryIO, Optional
 import os
+import asyncio
+import shutil
 import time
 from datetime import datetime
-import aiofiles
 
 from app.core.config import settings
 from app.models.schemas import (
-    DocumentUpload, SearchQuery, SearchResult, QuestionAnswer, 
+    DocumentUpload, SearchQuery, BatchSearchQuery, SearchResult, QuestionAnswer, 
     AnswerResponse, CompletenessCheck, CompletenessResponse,
     IndexStatus, DocumentDelete, DocumentListResponse
 )
@@ -21,6 +22,23 @@ document_processor = DocumentProcessor()
 vector_store = VectorStore()
 qa_service = QAService(vector_store)
 
+UPLOAD_COPY_CHUNK_SIZE = 1 << 20  # 1MB
+
+def _save_upload(source: BinaryIO, file_path: str, size: Optional[int]) -> Optional[bytes]:
+    """Write an upload to disk, returning its bytes when it is small enough to keep.
+    
+    Small files are handed to the parser from memory so they are not read
+    back from disk; larger ones are streamed in blocks and parsed from disk.
+    """
+    source.seek(0)
+    with open(file_path, 'wb') as f:
+        if size is not None and size <= settings.inline_parse_max_bytes:
+            content = source.read()
+            f.write(content)
+            return content
+        shutil.copyfileobj(source, f, UPLOAD_COPY_CHUNK_SIZE)
+    return None
+
 @router.post("/documents/upload", response_model=DocumentUpload)
 async def upload_document(file: UploadFile = File(...)):
     if file.size > settings.max_file_size:
@@ -41,13 +59,13 @@ async def upload_document(file: UploadFile = File(...)):
     file_path = os.path.join(settings.upload_dir, file.filename)
     
     try:
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        content = await asyncio.to_thread(_save_upload, file.file, file_path, file.size)
         
         start_time = time.time()
         
-        chunks, metadata = await document_processor.process_document(file_path, file.filename)
+        chunks, metadata = await document_processor.process_document(
+            file_path, file.filename, raw_content=content
+        )
         
         result = await vector_store.add_documents(chunks)
         
@@ -69,14 +87,27 @@ async def upload_document(file: UploadFile = File(...)):
 
 @router.post("/documents/upload-batch", response_model=List[DocumentUpload])
 async def upload_documents_batch(files: List[UploadFile] = File(...)):
-    results = []
+    # Uploads are stored under their filename, so files that share a name
+    # are processed one after another; distinct names run concurrently.
+    groups: Dict[str, List[int]] = {}
+    for i, file in enumerate(files):
+        groups.setdefault(file.filename, []).append(i)
+    
+    outcomes: List[Any] = [None] * len(files)
+    
+    async def upload_group(indices: List[int]):
+        for i in indices:
+            try:
+                outcomes[i] = await upload_document(files[i])
+            except Exception as e:
+                outcomes[i] = e
+    
+    await asyncio.gather(*[upload_group(indices) for indices in groups.values()])
     
-    for file in files:
-        try:
-            result = await upload_document(file)
-            results.append(result)
-        except Exception as e:
-            results.append(DocumentUpload(
+    results = []
+    for file, outcome in zip(files, outcomes):
+        if isinstance(outcome, Exception):
+            results.append(DocumentUpload.model_construct(
                 id="",
                 filename=file.filename,
                 status="failed",
@@ -84,6 +115,8 @@ async def upload_documents_batch(files: List[UploadFile] = File(...)):
                 embedding_time=0.0,
                 metadata=None
             ))
+        else:
+            results.append(outcome)
     
     return results
 
@@ -97,6 +130,16 @@ async def search_documents(query: SearchQuery):
     
     return results
 
+@router.post("/search/batch", response_model=List[List[SearchResult]])
+async def batch_search_documents(query: BatchSearchQuery):
+    results = await vector_store.batch_search(
+        queries=query.queries,
+        max_results=query.max_results,
+        similarity_threshold=query.similarity_threshold
+    )
+    
+    return results
+
 @router.post("/qa/ask", response_model=AnswerResponse)
 async def ask_question(question: QuestionAnswer):
     answer = await qa_service.answer_question(
@@ -117,7 +160,7 @@ async def check_completeness(check: CompletenessCheck):
 
 @router.get("/index/status", response_model=IndexStatus)
 async def get_index_status():
-    stats = vector_store.get_index_stats()
+    stats = await asyncio.to_thread(vector_store.get_index_stats)
     
     documents_count = len(os.listdir(settings.upload_dir))
     
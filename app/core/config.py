@@ -8,15 +8,39 @@ class Settings(BaseSettings):
     chroma_persist_directory: str = "./chroma_db"
     upload_dir: str = "./uploaded_documents"
     max_file_size: int = 100 * 1024 * 1024  # 100MB
+    inline_parse_max_bytes: int = 10 * 1024 * 1024  # 10MB
     
-    batch_size: int = 10
+    batch_size: int = 1024
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_backend: str = "torch"  # torch, onnx or openvino
+    embedding_precision: str = "auto"  # auto, fp32, fp16 or bf16
+    embedding_precision_min_similarity: float = 0.99
+    embedding_export_directory: str = "./exported_models"
+    embedding_quantize: bool = True
+    encode_batch_size: int = 64
+    torch_num_threads: int = 0  # 0 uses every CPU available to the process
+    encode_coalesce_window_ms: int = 10
+    encode_coalesce_max_texts: int = 256
     
     chunk_size: int = 1000
     chunk_overlap: int = 200
     
     max_search_results: int = 10
     similarity_threshold: float = 0.7
+    search_backend: str = "chroma"  # chroma, local or hnsw
+    chroma_hnsw_m: int = 32
+    chroma_hnsw_construction_ef: int = 200
+    chroma_hnsw_search_ef: int = 64
+    local_index_precision: str = "float32"  # float32, float16, int8 or binary
+    hnsw_connectivity: int = 16
+    hnsw_expansion_add: int = 64
+    hnsw_expansion_search: int = 100
+    rescore_multiplier: int = 4
+    
+    query_cache_size: int = 4096
+    result_cache_size: int = 256
+    result_cache_ttl: float = 300.0
+    semantic_cache_similarity: float = 0.97
     
     class Config:
         env_file = ".env"
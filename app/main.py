@@ -1,14 +1,27 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from app.api.routes import router
 from app.core.config import settings
+from app.services.document_processor import shutdown_parse_pool
+from app.services.vector_store import shutdown_encode_pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # concurrent.futures joins pool threads (running every queued job)
+    # before atexit handlers fire, so queued work is cancelled here.
+    shutdown_encode_pool()
+    shutdown_parse_pool()
 
 app = FastAPI(
     title=settings.app_name,
     debug=settings.debug,
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -31,6 +44,7 @@ async def root():
             "batch_upload": "/api/v1/documents/upload-batch",
             "documents": "/api/v1/documents",
             "search": "/api/v1/search",
+            "batch_search": "/api/v1/search/batch",
             "ask": "/api/v1/qa/ask",
             "completeness": "/api/v1/qa/completeness",
             "index_status": "/api/v1/index/status",
@@ -24,13 +24,18 @@ class DocumentUpload(BaseModel):
     status: str
     chunks_processed: int
     embedding_time: float
-    metadata: DocumentMetadata
+    metadata: Optional[DocumentMetadata] = None
     
 class SearchQuery(BaseModel):
     query: str
     max_results: Optional[int] = Field(default=10, le=50)
     similarity_threshold: Optional[float] = Field(default=0.7, ge=0.0, le=1.0)
     
+class BatchSearchQuery(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=50)
+    max_results: Optional[int] = Field(default=10, le=50)
+    similarity_threshold: Optional[float] = Field(default=0.7, ge=0.0, le=1.0)
+    
 class SearchResult(BaseModel):
     document_id: str
     filename: str
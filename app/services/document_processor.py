@@ -1,40 +1,76 @@
 import os
+import io
+import re
+import asyncio
 import hashlib
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional, Union, BinaryIO
 from pathlib import Path
 import pypdf
 from docx import Document as DocxDocument
 import markdown
 from bs4 import BeautifulSoup
-import aiofiles
+import numpy as np
 from datetime import datetime
 
 from app.models.schemas import DocumentType, DocumentMetadata
 from app.core.config import settings
 
+_WORD_RE = re.compile(r"\S+")
+
+# Parsing is CPU-bound and pypdf/lxml release the GIL for much of it, so
+# documents from a batch upload are extracted and chunked in parallel.
+_PARSE_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="parse"
+)
+
+def shutdown_parse_pool():
+    """Cancel queued parses; called from the app's shutdown hook."""
+    _PARSE_POOL.shutdown(wait=False, cancel_futures=True)
+
 class DocumentProcessor:
     def __init__(self):
         self.chunk_size = settings.chunk_size
         self.chunk_overlap = settings.chunk_overlap
+        if self.chunk_size - self.chunk_overlap <= 0:
+            raise ValueError(
+                f"chunk_overlap ({self.chunk_overlap}) must be smaller than "
+                f"chunk_size ({self.chunk_size})"
+            )
+        
+    async def process_document(
+        self,
+        file_path: str,
+        filename: str,
+        raw_content: Optional[bytes] = None
+    ) -> Tuple[List[Dict[str, Any]], DocumentMetadata]:
+        """Parse and chunk a document.
         
-    async def process_document(self, file_path: str, filename: str) -> Tuple[List[Dict[str, Any]], DocumentMetadata]:
+        When the caller already holds the file's bytes it can pass them as
+        ``raw_content`` and the file at ``file_path`` is not read again.
+        """
         file_extension = Path(filename).suffix.lower()
         document_type = self._get_document_type(file_extension)
         
-        content = await self._extract_content(file_path, document_type)
-        chunks = self._chunk_text(content)
+        document_id, chunks = await asyncio.get_running_loop().run_in_executor(
+            _PARSE_POOL,
+            self._parse_and_chunk,
+            file_path,
+            filename,
+            document_type,
+            raw_content
+        )
         
-        file_stats = os.stat(file_path)
+        size = len(raw_content) if raw_content is not None else os.stat(file_path).st_size
         metadata = DocumentMetadata(
             filename=filename,
             document_type=document_type,
-            size=file_stats.st_size,
+            size=size,
             created_at=datetime.utcnow(),
             chunk_count=len(chunks)
         )
         
-        document_id = self._generate_document_id(filename, content)
-        
         processed_chunks = []
         for i, chunk in enumerate(chunks):
             chunk_data = {
@@ -42,6 +78,7 @@ class DocumentProcessor:
                 "chunk_id": f"{document_id}_{i}",
                 "content": chunk,
                 "metadata": {
+                    "document_id": document_id,
                     "filename": filename,
                     "document_type": document_type.value,
                     "chunk_index": i,
@@ -64,62 +101,94 @@ class DocumentProcessor:
         }
         return extension_map.get(extension, DocumentType.TXT)
     
-    async def _extract_content(self, file_path: str, document_type: DocumentType) -> str:
+    def _parse_and_chunk(
+        self,
+        file_path: str,
+        filename: str,
+        document_type: DocumentType,
+        raw_content: Optional[bytes] = None
+    ) -> Tuple[str, List[str]]:
+        """Extract, chunk and hash a document; returns its id and chunks.
+        
+        Hashing the full content is as CPU-bound as parsing, so it runs here
+        on the parse pool rather than on the event loop.
+        """
+        source = io.BytesIO(raw_content) if raw_content is not None else file_path
+        content = self._extract_content(source, document_type)
+        return self._generate_document_id(filename, content), self._chunk_text(content)
+    
+    def _extract_content(self, source: Union[str, BinaryIO], document_type: DocumentType) -> str:
         if document_type == DocumentType.PDF:
-            return await self._extract_pdf(file_path)
+            return self._extract_pdf(source)
         elif document_type == DocumentType.DOCX:
-            return await self._extract_docx(file_path)
+            return self._extract_docx(source)
         elif document_type == DocumentType.MD:
-            return await self._extract_markdown(file_path)
+            return self._extract_markdown(source)
         elif document_type == DocumentType.HTML:
-            return await self._extract_html(file_path)
+            return self._extract_html(source)
         else:
-            return await self._extract_text(file_path)
+            return self._extract_text(source)
     
-    async def _extract_pdf(self, file_path: str) -> str:
-        with open(file_path, 'rb') as file:
-            pdf_reader = pypdf.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+    def _extract_pdf(self, source: Union[str, BinaryIO]) -> str:
+        pdf_reader = pypdf.PdfReader(source)
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
         return text.strip()
     
-    async def _extract_docx(self, file_path: str) -> str:
-        doc = DocxDocument(file_path)
+    def _extract_docx(self, source: Union[str, BinaryIO]) -> str:
+        doc = DocxDocument(source)
         text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
         return text.strip()
     
-    async def _extract_markdown(self, file_path: str) -> str:
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as file:
-            content = await file.read()
+    def _extract_markdown(self, source: Union[str, BinaryIO]) -> str:
+        content = self._read_text(source)
         html = markdown.markdown(content)
         soup = BeautifulSoup(html, 'html.parser')
         return soup.get_text().strip()
     
-    async def _extract_html(self, file_path: str) -> str:
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as file:
-            content = await file.read()
+    def _extract_html(self, source: Union[str, BinaryIO]) -> str:
+        content = self._read_text(source)
         soup = BeautifulSoup(content, 'html.parser')
         return soup.get_text().strip()
     
-    async def _extract_text(self, file_path: str) -> str:
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as file:
-            return await file.read()
+    def _extract_text(self, source: Union[str, BinaryIO]) -> str:
+        return self._read_text(source)
+    
+    def _read_text(self, source: Union[str, BinaryIO]) -> str:
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8') as file:
+                return file.read()
+        # Same universal-newline handling as text-mode open(), so a document
+        # gets the same content (and id) whichever way it was read.
+        with io.TextIOWrapper(source, encoding='utf-8') as file:
+            return file.read()
     
     def _chunk_text(self, text: str) -> List[str]:
         if not text:
             return []
-            
-        chunks = []
-        words = text.split()
         
-        for i in range(0, len(words), self.chunk_size - self.chunk_overlap):
-            chunk = ' '.join(words[i:i + self.chunk_size])
-            if chunk:
-                chunks.append(chunk)
-                
-        return chunks
+        # Record where every word starts and ends, then slice each chunk
+        # straight out of the text instead of re-joining its words.
+        spans = np.fromiter(
+            (offset for match in _WORD_RE.finditer(text) for offset in match.span()),
+            dtype=np.int64
+        ).reshape(-1, 2)
+        word_count = len(spans)
+        if word_count == 0:
+            return []
+        
+        first_words = np.arange(0, word_count, self.chunk_size - self.chunk_overlap)
+        last_words = np.minimum(first_words + self.chunk_size, word_count) - 1
+        char_starts = spans[first_words, 0].tolist()
+        char_ends = spans[last_words, 1].tolist()
+        
+        return [text[start:end] for start, end in zip(char_starts, char_ends)]
     
     def _generate_document_id(self, filename: str, content: str) -> str:
-        unique_string = f"{filename}_{len(content)}_{content[:100]}"
-        return hashlib.md5(unique_string.encode()).hexdigest()
\ No newline at end of file
+        # Hash the full content rather than a prefix so near-duplicate documents
+        # get distinct ids; SHA-256 is hardware-accelerated (SHA-NI) in OpenSSL.
+        digest = hashlib.sha256(filename.encode())
+        digest.update(b"\0")
+        digest.update(content.encode())
+        return digest.hexdigest()[:32]
\ No newline at end of file
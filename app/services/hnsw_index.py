@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+from typing import List, Dict, Tuple
+
+import numpy as np
+
+
+class HNSWIndex:
+    """usearch HNSW graph over the Chroma embeddings, keyed by chunk id.
+
+    usearch addresses vectors by integer key, so chunk ids are mapped to
+    monotonically increasing keys that are persisted next to the graph.
+    The graph itself supports concurrent searches; the lock only guards the
+    key mapping and the creation of the graph.
+    """
+
+    exact = True
+
+    def __init__(
+        self,
+        directory: str,
+        connectivity: int = 16,
+        expansion_add: int = 64,
+        expansion_search: int = 100
+    ):
+        try:
+            from usearch.index import Index
+        except ImportError as e:
+            raise ImportError(
+                "SEARCH_BACKEND=hnsw requires the usearch package: pip install usearch"
+            ) from e
+
+        self._index_cls = Index
+        self.connectivity = connectivity
+        self.expansion_add = expansion_add
+        self.expansion_search = expansion_search
+        self.index_path = os.path.join(directory, "embeddings.usearch")
+        self.keys_path = os.path.join(directory, "embeddings.usearch.keys.json")
+        os.makedirs(directory, exist_ok=True)
+
+        self.index = None
+        self._keys: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _new_index(self, ndim: int):
+        return self._index_cls(
+            ndim=ndim,
+            metric="cos",
+            dtype="f16",
+            connectivity=self.connectivity,
+            expansion_add=self.expansion_add,
+            expansion_search=self.expansion_search
+        )
+
+    def _load(self):
+        if not os.path.exists(self.index_path) or not os.path.exists(self.keys_path):
+            return
+        with open(self.keys_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        index = self._index_cls.restore(self.index_path)
+        if index is None or len(index) != len(state["ids"]):
+            return
+        self.index = index
+        self._ids = {int(key): chunk_id for key, chunk_id in state["ids"].items()}
+        self._keys = {chunk_id: key for key, chunk_id in self._ids.items()}
+        self._next_key = state["next_key"]
+
+    def save(self):
+        with self._lock:
+            if self.index is None:
+                return
+            self.index.save(self.index_path)
+            with open(self.keys_path, "w", encoding="utf-8") as f:
+                json.dump({"next_key": self._next_key, "ids": self._ids}, f)
+
+    def clear(self):
+        with self._lock:
+            self.index = None
+            self._keys = {}
+            self._ids = {}
+            self._next_key = 0
+            for path in (self.index_path, self.keys_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def add(self, ids: List[str], embeddings: np.ndarray):
+        with self._lock:
+            # Mirror Chroma, which ignores ids that already exist.
+            keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in self._keys]
+            if not keep:
+                return
+
+            vectors = np.asarray(embeddings, dtype=np.float32)[keep]
+            if self.index is None:
+                self.index = self._new_index(vectors.shape[1])
+
+            keys = np.arange(self._next_key, self._next_key + len(keep), dtype=np.uint64)
+            self.index.add(keys, vectors)
+            for key, i in zip(keys.tolist(), keep):
+                self._keys[ids[i]] = key
+                self._ids[key] = ids[i]
+            self._next_key += len(keep)
+
+    def remove(self, ids: List[str]) -> int:
+        with self._lock:
+            keys = [self._keys.pop(chunk_id) for chunk_id in ids if chunk_id in self._keys]
+            if not keys:
+                return 0
+            for key in keys:
+                del self._ids[key]
+            self.index.remove(np.asarray(keys, dtype=np.uint64))
+            return len(keys)
+
+    def search(self, query_embedding: np.ndarray, k: int) -> Tuple[List[str], np.ndarray]:
+        """Return the ids and cosine scores of the k nearest rows, best first."""
+        index = self.index
+        if index is None or not self._keys or k <= 0:
+            return [], np.empty(0, dtype=np.float32)
+
+        matches = index.search(
+            np.asarray(query_embedding, dtype=np.float32),
+            min(k, len(self._keys))
+        )
+        ids = []
+        scores = []
+        for key, distance in zip(matches.keys.tolist(), matches.distances.tolist()):
+            chunk_id = self._ids.get(key)
+            if chunk_id is not None:
+                ids.append(chunk_id)
+                scores.append(1.0 - distance)
+        return ids, np.asarray(scores, dtype=np.float32)
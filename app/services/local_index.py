@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Rows scored per step when the stored dtype has no BLAS kernel.
+_BLOCK_ROWS = 65536
+
+# Set bits in every byte value, for Hamming distances over packed codes.
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+if njit is not None:
+    # Compiled loops for the int8 paths, which numpy runs without SIMD
+    # kernels (there is no BLAS for int8). ``cache=True`` keeps the machine
+    # code on disk so only the very first start pays for compilation.
+    @njit(parallel=True, cache=True)
+    def _quantize_int8_rows(embeddings, codes, scales):
+        for i in prange(embeddings.shape[0]):
+            max_abs = np.float32(0.0)
+            for j in range(embeddings.shape[1]):
+                max_abs = max(max_abs, abs(embeddings[i, j]))
+            scale = np.float32(127.0) / max_abs if max_abs > 0 else np.float32(127.0)
+            scales[i] = scale
+            for j in range(embeddings.shape[1]):
+                codes[i, j] = min(max(np.rint(embeddings[i, j] * scale), -127), 127)
+
+    @njit(parallel=True, cache=True)
+    def _int8_dots(codes, query, out):
+        for i in prange(codes.shape[0]):
+            total = 0
+            for j in range(codes.shape[1]):
+                total += np.int32(codes[i, j]) * np.int32(query[j])
+            out[i] = total
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def _identity(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return embeddings, np.ones(len(embeddings), dtype=np.float32)
+
+
+def _quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization; returns the codes and their scales."""
+    if njit is not None:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        codes = np.empty(embeddings.shape, dtype=np.int8)
+        scales = np.empty(len(embeddings), dtype=np.float32)
+        _quantize_int8_rows(embeddings, codes, scales)
+        return codes, scales
+    max_abs = np.abs(embeddings).max(axis=1)
+    max_abs[max_abs == 0] = 1.0
+    scales = (127.0 / max_abs).astype(np.float32)
+    codes = np.clip(np.rint(embeddings * scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def _quantize_binary(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """One sign bit per dimension, packed eight to a byte."""
+    return np.packbits(embeddings > 0, axis=1), np.ones(len(embeddings), dtype=np.float32)
+
+
+_ENCODERS = {
+    "float32": (_identity, np.float32),
+    "float16": (_identity, np.float16),
+    "int8": (_quantize_int8, np.int8),
+    "binary": (_quantize_binary, np.uint8),
+}
+
+
+class LocalIndex:
+    """Memory-mapped mirror of the Chroma embeddings, keyed by chunk id.
+
+    Embeddings are kept as one contiguous (N, D) matrix of L2-normalized
+    rows in a raw file that is memory-mapped at start-up, with chunk ids in
+    a parallel list, so a search is a single matrix-vector product over
+    pages the OS keeps cached. With ``float32`` or ``float16`` precision the
+    scores are cosine similarities. With ``int8`` each row is quantized with
+    its own scale, and with ``binary`` only the sign of each dimension is
+    kept and rows are ranked by Hamming distance; both give approximate
+    scores and callers should rescore candidates.
+
+    New rows are appended to the file, removals rewrite it and swap it into
+    place; either way the mapping is replaced rather than mutated, so a
+    search only holds the lock long enough to take a consistent snapshot.
+    """
+
+    def __init__(self, directory: str, precision: str = "float32"):
+        if precision not in _ENCODERS:
+            raise ValueError(
+                f"Unsupported local index precision {precision}. "
+                f"Allowed values: {list(_ENCODERS)}"
+            )
+        self.directory = directory
+        self.precision = precision
+        self._quantize, self._dtype = _ENCODERS[precision]
+        self.codes_path = os.path.join(directory, f"embeddings.{precision}.bin")
+        self.scales_path = os.path.join(directory, f"embeddings.{precision}.scales.npy")
+        self.ids_path = os.path.join(directory, f"embeddings.{precision}.ids.json")
+        os.makedirs(directory, exist_ok=True)
+
+        self.dim: Optional[int] = None
+        self.ids: List[str] = []
+        self.codes = np.empty((0, 0), dtype=self._dtype)
+        self.scales = np.empty(0, dtype=np.float32)
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def exact(self) -> bool:
+        return self.precision in ("float32", "float16")
+
+    def _map(self, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty((0, self.dim or 0), dtype=self._dtype)
+        return np.memmap(self.codes_path, dtype=self._dtype, mode="r", shape=(rows, self.dim))
+
+    def _load(self):
+        if not all(os.path.exists(p) for p in (self.codes_path, self.scales_path, self.ids_path)):
+            return
+        with open(self.ids_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        ids, dim = state["ids"], state["dim"]
+        scales = np.load(self.scales_path)
+        row_bytes = (dim or 0) * np.dtype(self._dtype).itemsize
+        rows = os.path.getsize(self.codes_path) // row_bytes if row_bytes else 0
+        # A crash between appending rows and saving the ids leaves them out of
+        # step; start empty and let the caller rebuild from Chroma.
+        if len(ids) != rows or len(ids) != len(scales):
+            return
+        self.dim = dim
+        self.ids, self.scales = ids, scales
+        self.codes = self._map(rows)
+        self._positions = {chunk_id: i for i, chunk_id in enumerate(ids)}
+
+    def save(self):
+        """Persist ids and scales; matrix rows are written as they change."""
+        with self._lock:
+            ids, scales, dim = self.ids, self.scales, self.dim
+        np.save(self.scales_path, scales)
+        with open(self.ids_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": dim, "ids": ids}, f)
+
+    def clear(self):
+        with self._lock:
+            open(self.codes_path, "wb").close()
+            self.dim = None
+            self.ids = []
+            self.codes = np.empty((0, 0), dtype=self._dtype)
+            self.scales = np.empty(0, dtype=np.float32)
+            self._positions = {}
+
+    def add(self, ids: List[str], embeddings: np.ndarray):
+        with self._lock:
+            # Mirror Chroma, which ignores ids that already exist.
+            keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in self._positions]
+            if not keep:
+                return
+
+            codes, scales = self._quantize(_normalize(np.asarray(embeddings)[keep]))
+            new_ids = [ids[i] for i in keep]
+            if self.dim is None:
+                self.dim = codes.shape[1]
+
+            with open(self.codes_path, "ab" if self.ids else "wb") as f:
+                f.write(np.ascontiguousarray(codes, dtype=self._dtype).tobytes())
+
+            positions = dict(self._positions)
+            for offset, chunk_id in enumerate(new_ids):
+                positions[chunk_id] = len(self.ids) + offset
+            self.ids = self.ids + new_ids
+            self.codes = self._map(len(self.ids))
+            self.scales = np.concatenate([self.scales, scales])
+            self._positions = positions
+
+    def remove(self, ids: List[str]) -> int:
+        with self._lock:
+            doomed = {self._positions[chunk_id] for chunk_id in ids if chunk_id in self._positions}
+            if not doomed:
+                return 0
+
+            mask = np.ones(len(self.ids), dtype=bool)
+            mask[list(doomed)] = False
+            # Searches may still be reading the old mapping, so write the
+            # compacted matrix beside it and swap it in.
+            tmp_path = f"{self.codes_path}.tmp"
+            np.asarray(self.codes[mask]).tofile(tmp_path)
+            os.replace(tmp_path, self.codes_path)
+
+            self.ids = [chunk_id for chunk_id, keep in zip(self.ids, mask) if keep]
+            self.codes = self._map(len(self.ids))
+            self.scales = self.scales[mask]
+            self._positions = {chunk_id: i for i, chunk_id in enumerate(self.ids)}
+            return len(doomed)
+
+    def _scores(self, codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+        query_codes, query_scales = self._quantize(query.reshape(1, -1))
+        if self._dtype == np.int8:
+            if njit is not None:
+                dots = np.empty(len(codes), dtype=np.int32)
+                _int8_dots(np.asarray(codes), query_codes[0], dots)
+            else:
+                dots = np.einsum("ij,j->i", codes, query_codes[0], dtype=np.int32)
+            return dots / (scales * query_scales[0])
+        if self._dtype == np.float32:
+            return codes @ query_codes[0]
+
+        # numpy has no BLAS kernel for float16 or popcount; work a block at a
+        # time instead of materializing an (N, D) temporary.
+        scores = np.empty(len(codes), dtype=np.float32)
+        bits = codes.shape[1] * 8
+        for start in range(0, len(codes), _BLOCK_ROWS):
+            block = np.asarray(codes[start:start + _BLOCK_ROWS])
+            if self._dtype == np.uint8:
+                distances = _POPCOUNT[block ^ query_codes[0]].sum(axis=1)
+                scores[start:start + len(block)] = 1.0 - 2.0 * distances / bits
+            else:
+                scores[start:start + len(block)] = block.astype(np.float32) @ query_codes[0]
+        return scores
+
+    def search(self, query_embedding: np.ndarray, k: int) -> Tuple[List[str], np.ndarray]:
+        """Return the ids and cosine scores of the k best rows, best first."""
+        with self._lock:
+            ids, codes, scales = self.ids, self.codes, self.scales
+        if not ids or k <= 0:
+            return [], np.empty(0, dtype=np.float32)
+
+        scores = self._scores(codes, scales, _normalize(query_embedding.reshape(1, -1))[0])
+
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [ids[i] for i in top], scores[top]
@@ -0,0 +1,103 @@
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+
+
+class ONNXEncoder:
+    """Sentence embeddings from an ONNX Runtime export of a transformers model.
+
+    The model is exported with optimum on first use and, when ``quantize``
+    is set, dynamically quantized to int8 weights (VNNI kernels on CPUs that
+    have them). Both graphs are cached under ``cache_dir`` so later starts
+    only load them. Token embeddings are mean-pooled over the attention mask
+    and L2-normalized, which reproduces the sentence-transformers pipeline
+    of MiniLM-style models.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str, quantize: bool = True):
+        model_dir = os.path.join(cache_dir, model_name.replace("/", "--"))
+        self.model, tokenizer_dir = self._load_model(model_name, model_dir, quantize)
+
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_dir)
+        self.max_seq_length = self._max_seq_length(model_name)
+
+    def _load_model(self, model_name: str, model_dir: str, quantize: bool):
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_BACKEND=onnx requires optimum with onnxruntime: "
+                "pip install optimum[onnxruntime]"
+            ) from e
+
+        onnx_dir = os.path.join(model_dir, "onnx")
+        if not os.path.exists(os.path.join(onnx_dir, "model.onnx")):
+            model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            model.save_pretrained(onnx_dir)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(onnx_dir)
+
+        model_path, file_name = onnx_dir, "model.onnx"
+        if quantize:
+            model_path, file_name = os.path.join(model_dir, "onnx-int8"), "model_quantized.onnx"
+            if not os.path.exists(os.path.join(model_path, file_name)):
+                self._quantize(onnx_dir, model_path)
+
+        model = ORTModelForFeatureExtraction.from_pretrained(model_path, file_name=file_name)
+        return model, onnx_dir
+
+    @staticmethod
+    def _quantize(onnx_dir: str, save_dir: str):
+        from optimum.onnxruntime import ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        quantizer = ORTQuantizer.from_pretrained(onnx_dir)
+        config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=save_dir, quantization_config=config)
+
+    def _max_seq_length(self, model_name: str) -> int:
+        # sentence-transformers truncates shorter than the tokenizer limit
+        # (256 vs 512 tokens for MiniLM); match it so embeddings agree.
+        max_length: Optional[int] = None
+        try:
+            from huggingface_hub import hf_hub_download
+
+            with open(hf_hub_download(model_name, "sentence_bert_config.json"), encoding="utf-8") as f:
+                max_length = json.load(f).get("max_seq_length")
+        except Exception:
+            pass
+        return max_length or min(self.tokenizer.model_max_length, 512)
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        # Every batch is padded to its longest text, so batch texts of similar
+        # length together (as sentence-transformers does) and restore the
+        # caller's order at the end.
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        sorted_texts = [texts[i] for i in order]
+
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                sorted_texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            embeddings.append(pooled)
+
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        embeddings = np.concatenate(embeddings).astype(np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        unsorted = np.empty_like(embeddings)
+        unsorted[order] = embeddings / norms
+        return unsorted
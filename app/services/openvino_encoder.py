@@ -0,0 +1,34 @@
+import os
+
+from app.services.onnx_encoder import ONNXEncoder
+
+
+class OpenVINOEncoder(ONNXEncoder):
+    """ONNXEncoder variant that runs an OpenVINO IR export of the model.
+
+    With ``quantize`` the weights are compressed to int8 while exporting,
+    which OpenVINO executes with VNNI/AMX kernels where the CPU has them.
+    """
+
+    def _load_model(self, model_name: str, model_dir: str, quantize: bool):
+        try:
+            from optimum.intel import OVModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_BACKEND=openvino requires optimum-intel with OpenVINO: "
+                "pip install optimum-intel[openvino]"
+            ) from e
+
+        ir_dir = os.path.join(model_dir, "openvino-int8" if quantize else "openvino")
+        if not os.path.exists(os.path.join(ir_dir, "openvino_model.xml")):
+            model = OVModelForFeatureExtraction.from_pretrained(
+                model_name,
+                export=True,
+                load_in_8bit=quantize
+            )
+            model.save_pretrained(ir_dir)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(ir_dir)
+            return model, ir_dir
+
+        return OVModelForFeatureExtraction.from_pretrained(ir_dir), ir_dir
@@ -5,6 +5,41 @@ from app.services.vector_store import VectorStore
 from app.models.schemas import SearchResult, AnswerResponse, CompletenessResult, CompletenessResponse
 from app.core.config import settings
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+_SENTENCE_RE = re.compile(r'[^.!?]+')
+
+# Define common aspects for various topics
+_TOPIC_ASPECTS = {
+    "machine learning": ["supervised", "unsupervised", "reinforcement", "neural networks", "training", "models"],
+    "deep learning": ["neural networks", "backpropagation", "layers", "activation", "convolution", "recurrent"],
+    "data science": ["analysis", "visualization", "statistics", "cleaning", "modeling", "insights"],
+    "artificial intelligence": ["machine learning", "neural networks", "nlp", "computer vision", "reasoning"],
+    "supervised learning": ["classification", "regression", "labeled data", "training", "prediction"],
+    "unsupervised learning": ["clustering", "dimensionality", "patterns", "unlabeled", "grouping"],
+    "reinforcement learning": ["agent", "environment", "reward", "policy", "action", "state"]
+}
+
+def _build_aspect_automaton():
+    """Aho-Corasick automaton over every predefined aspect, if pyahocorasick is installed.
+    
+    One pass over the content then finds all aspects, including overlapping
+    ones, instead of one substring scan per aspect.
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for aspects in _TOPIC_ASPECTS.values():
+        for aspect in aspects:
+            automaton.add_word(aspect.lower(), aspect.lower())
+    automaton.make_automaton()
+    return automaton
+
+_ASPECT_AUTOMATON = _build_aspect_automaton()
+
 class QAService:
     def __init__(self, vector_store: VectorStore):
         self.vector_store = vector_store
@@ -32,7 +67,7 @@ class QAService:
             )
         
         context = self._prepare_context(relevant_chunks)
-        answer = self._generate_extractive_answer(question, relevant_chunks)
+        answer = await self._generate_extractive_answer(question, relevant_chunks)
         confidence = self._calculate_confidence(relevant_chunks)
         
         return AnswerResponse(
@@ -51,7 +86,7 @@ class QAService:
             )
         return "\n---\n".join(context_parts)
     
-    def _generate_extractive_answer(self, question: str, chunks: List[SearchResult]) -> str:
+    async def _generate_extractive_answer(self, question: str, chunks: List[SearchResult]) -> str:
         """Generate answer by extracting and combining relevant sentences from chunks."""
         if not chunks:
             return "No relevant information found."
@@ -61,18 +96,32 @@ class QAService:
         for chunk in chunks[:3]:  # Use top 3 chunks
             sentences = self._extract_sentences(chunk.content)
             for sent in sentences:
-                all_sentences.append((sent, chunk.similarity_score, chunk.filename))
+                all_sentences.append((sent, chunk.filename))
+        
+        if not all_sentences:
+            return f"Based on the search results:\n\n{chunks[0].content[:300]}..."
+        
+        # Embed every candidate sentence in a single batch and compare it
+        # with the question, rather than reusing the whole chunk's score.
+        # Embeddings are unit length, so the dot product is the cosine.
+        sentence_embeddings = await self.vector_store.embed_texts(
+            [sent for sent, _ in all_sentences]
+        )
+        question_embedding = await self.vector_store.embed_query(question)
+        sentence_similarities = sentence_embeddings @ question_embedding
         
         # Score sentences based on relevance to question
-        question_words = set(question.lower().split())
+        question_words = frozenset(question.lower().split())
+        question_word_count = max(len(question_words), 1)
         scored_sentences = []
         
-        for sent, chunk_score, filename in all_sentences:
-            sent_words = set(sent.lower().split())
-            word_overlap = len(question_words.intersection(sent_words))
+        for (sent, filename), similarity in zip(all_sentences, sentence_similarities):
+            # Intersecting with the token list directly avoids building a
+            # set for every sentence; only the matching words are collected.
+            word_overlap = len(question_words.intersection(sent.lower().split()))
             
-            # Score based on word overlap and chunk similarity
-            score = (word_overlap / len(question_words)) * 0.5 + chunk_score * 0.5
+            # Score based on word overlap and sentence similarity
+            score = (word_overlap / question_word_count) * 0.5 + float(similarity) * 0.5
             scored_sentences.append((sent, score, filename))
         
         # Sort by score and select top sentences
@@ -95,11 +144,10 @@ class QAService:
     
     def _extract_sentences(self, text: str) -> List[str]:
         """Extract sentences from text."""
-        # Simple sentence extraction
-        sentences = re.split(r'[.!?]+', text)
-        # Clean and filter
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
-        return sentences
+        # Simple sentence extraction: runs of text between terminators
+        sentences = (match.group().strip() for match in _SENTENCE_RE.finditer(text))
+        # Filter out fragments
+        return [s for s in sentences if len(s) > 20]
     
     def _calculate_confidence(self, chunks: List[SearchResult]) -> float:
         if not chunks:
@@ -120,13 +168,15 @@ class QAService:
     ) -> CompletenessResponse:
         results = []
         
-        for topic in topics:
-            relevant_chunks = await self.vector_store.search(
-                query=topic,
-                max_results=10,
-                similarity_threshold=settings.similarity_threshold
-            )
-            
+        # Encode every topic in one batch and look them all up together
+        searches = await self.vector_store.batch_search(
+            topics,
+            max_results=10,
+            similarity_threshold=settings.similarity_threshold,
+            document_ids=document_ids
+        )
+        
+        for topic, relevant_chunks in zip(topics, searches):
             if relevant_chunks:
                 covered_aspects, missing_aspects = self._analyze_coverage_locally(
                     topic, relevant_chunks
@@ -167,28 +217,23 @@ class QAService:
     ) -> Tuple[List[str], List[str]]:
         """Analyze coverage using keyword and semantic matching."""
         content = " ".join([chunk.content.lower() for chunk in chunks])
-        
-        # Define common aspects for various topics
-        topic_aspects = {
-            "machine learning": ["supervised", "unsupervised", "reinforcement", "neural networks", "training", "models"],
-            "deep learning": ["neural networks", "backpropagation", "layers", "activation", "convolution", "recurrent"],
-            "data science": ["analysis", "visualization", "statistics", "cleaning", "modeling", "insights"],
-            "artificial intelligence": ["machine learning", "neural networks", "nlp", "computer vision", "reasoning"],
-            "supervised learning": ["classification", "regression", "labeled data", "training", "prediction"],
-            "unsupervised learning": ["clustering", "dimensionality", "patterns", "unlabeled", "grouping"],
-            "reinforcement learning": ["agent", "environment", "reward", "policy", "action", "state"]
-        }
+        content_words = None
         
         # Get aspects for the topic
         topic_lower = topic.lower()
         aspects = []
         
         # Check if topic matches any predefined topics
-        for key, values in topic_aspects.items():
+        for key, values in _TOPIC_ASPECTS.items():
             if key in topic_lower or topic_lower in key:
                 aspects.extend(values)
                 break
         
+        # Predefined aspects are all found in a single automaton pass
+        found_aspects = None
+        if aspects and _ASPECT_AUTOMATON is not None:
+            found_aspects = {aspect for _, aspect in _ASPECT_AUTOMATON.iter(content)}
+        
         # If no predefined aspects, generate from topic words
         if not aspects:
             topic_words = topic_lower.split()
@@ -199,13 +244,19 @@ class QAService:
         missing = []
         
         for aspect in aspects:
-            if aspect.lower() in content:
+            aspect_lower = aspect.lower()
+            if found_aspects is not None:
+                verbatim = aspect_lower in found_aspects
+            else:
+                verbatim = aspect_lower in content
+            if verbatim:
                 covered.append(f"Coverage of {aspect}")
             else:
-                # Check for semantic similarity
-                aspect_words = set(aspect.lower().split())
-                content_words = set(content.split())
-                if len(aspect_words.intersection(content_words)) > 0:
+                # Check for semantic similarity; the word set is built once,
+                # the first time an aspect is not found verbatim
+                if content_words is None:
+                    content_words = set(content.split())
+                if not content_words.isdisjoint(aspect_lower.split()):
                     covered.append(f"Partial coverage of {aspect}")
                 else:
                     missing.append(f"Missing information about {aspect}")
@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Hashable, Callable
+
+import numpy as np
+
+from app.models.schemas import SearchResult
+
+
+class QueryCache:
+    """Caches query embeddings by text and search results by query embedding.
+
+    A result lookup first tries the exact embedding, then falls back to the
+    most similar cached query with the same search parameters whose cosine
+    similarity is at least ``semantic_similarity``. Result entries expire
+    after ``ttl`` seconds and are dropped whenever the index changes.
+    Embeddings come from the encoder and are already L2-normalized.
+    """
+
+    def __init__(
+        self,
+        max_embeddings: int = 4096,
+        max_results: int = 256,
+        ttl: float = 300.0,
+        semantic_similarity: float = 0.97,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_embeddings = max_embeddings
+        self.max_results = max_results
+        self.ttl = ttl
+        self.semantic_similarity = semantic_similarity
+        self.generation = 0
+        self._clock = clock
+
+        self._embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._results: "OrderedDict[Tuple[Hashable, bytes], Tuple[float, np.ndarray, List[SearchResult]]]" = OrderedDict()
+
+    def get_embedding(self, query: str) -> Optional[np.ndarray]:
+        embedding = self._embeddings.get(query)
+        if embedding is not None:
+            self._embeddings.move_to_end(query)
+        return embedding
+
+    def put_embedding(self, query: str, embedding: np.ndarray):
+        if self.max_embeddings <= 0:
+            return
+        self._embeddings[query] = embedding
+        self._embeddings.move_to_end(query)
+        while len(self._embeddings) > self.max_embeddings:
+            self._embeddings.popitem(last=False)
+
+    def get_results(self, embedding: np.ndarray, params: Hashable) -> Optional[List[SearchResult]]:
+        if self.max_results <= 0:
+            return None
+
+        key = (params, embedding.tobytes())
+        now = self._clock()
+        entry = self._results.get(key)
+        if entry is not None and now - entry[0] < self.ttl:
+            self._results.move_to_end(key)
+            return list(entry[2])
+
+        candidates = [
+            (cached_key, cached)
+            for cached_key, cached in self._results.items()
+            if cached_key[0] == params and now - cached[0] < self.ttl
+        ]
+        if not candidates:
+            return None
+
+        cached_embeddings = np.stack([cached[1] for _, cached in candidates])
+        similarities = cached_embeddings @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.semantic_similarity:
+            return None
+
+        best_key, best_entry = candidates[best]
+        self._results.move_to_end(best_key)
+        return list(best_entry[2])
+
+    def put_results(
+        self,
+        embedding: np.ndarray,
+        params: Hashable,
+        results: List[SearchResult],
+        generation: int
+    ):
+        # A search that started before the index changed must not repopulate
+        # the cache with results computed against the old index.
+        if self.max_results <= 0 or generation != self.generation:
+            return
+
+        key = (params, embedding.tobytes())
+        self._results[key] = (self._clock(), embedding, list(results))
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+
+    def invalidate_results(self):
+        self.generation += 1
+        self._results.clear()
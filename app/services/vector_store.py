@@ -1,64 +1,299 @@
+import os
+
+from app.core.config import settings
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+# Encodes are serialized by the pool and semaphore, so give the single
+# in-flight encode every core instead of torch's (often misdetected) default.
+# OpenMP and MKL read their thread counts once, when torch loads them.
+_NUM_THREADS = settings.torch_num_threads or _available_cpus()
+os.environ.setdefault("OMP_NUM_THREADS", str(_NUM_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(_NUM_THREADS))
+
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any, Optional
+import torch
+from typing import List, Dict, Any, Optional, Union
 import numpy as np
-from tqdm import tqdm
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-import os
+from functools import lru_cache
+import warnings
 
-from app.core.config import settings
 from app.models.schemas import SearchResult
+from app.services.local_index import LocalIndex
+from app.services.hnsw_index import HNSWIndex
+from app.services.onnx_encoder import ONNXEncoder
+from app.services.openvino_encoder import OpenVINOEncoder
+from app.services.query_cache import QueryCache
+
+_PRECISION_DTYPES = {
+    "fp32": torch.float32,
+    "fp16": torch.float16,
+    "bf16": torch.bfloat16,
+}
+
+# Held-out texts used to check that reduced precision preserves embeddings.
+_PRECISION_PROBES = [
+    "How do I reset my password?",
+    "Quarterly revenue grew 12% year over year, driven by subscription sales.",
+    "The mitochondria is the membrane-bound organelle that produces ATP.",
+    "Install the package with pip and run the server on port 8000.",
+    "Neural networks learn representations by adjusting weights through backpropagation.",
+    "Refunds are processed within five business days of receiving the returned item.",
+]
+
+torch.set_num_threads(_NUM_THREADS)
+
+# SentenceTransformer.encode is not thread-safe and every model call shares
+# one instance, so encodes run one at a time on a single worker; parallelism
+# comes from torch's intra-op threads and from coalescing requests.
+_ENCODE_POOL = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix="encode"
+)
+
+def shutdown_encode_pool():
+    """Cancel queued encodes; called from the app's shutdown hook."""
+    _ENCODE_POOL.shutdown(wait=False, cancel_futures=True)
+
+def _walk_size(path: str) -> int:
+    size = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                size += _walk_size(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                size += entry.stat(follow_symlinks=False).st_size
+    return size
+
+@lru_cache(maxsize=1)
+def _dir_size(path: str, mtime_ns: int, writes: int) -> int:
+    return _walk_size(path)
+
+def _cpu_supports_bf16() -> bool:
+    for probe in ("_is_amx_tile_supported", "_is_avx512_bf16_supported"):
+        check = getattr(torch.cpu, probe, None)
+        if check is not None and check():
+            return True
+    return False
 
 class VectorStore:
     def __init__(self):
-        self.embedding_model = SentenceTransformer(settings.embedding_model)
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.embedding_model = self._load_embedding_model()
+        # Uncased models (MiniLM among them) lowercase their input anyway, so
+        # query case only matters for the cache key.
+        tokenizer = getattr(self.embedding_model, "tokenizer", None)
+        self._lowercase_queries = bool(getattr(tokenizer, "do_lower_case", False))
         self.chroma_client = chromadb.PersistentClient(
             path=settings.chroma_persist_directory,
             settings=ChromaSettings(anonymized_telemetry=False)
         )
         self.collection_name = "knowledge_base"
         self._ensure_collection()
+        self._migrate_legacy_chunks()
+        
+        index_dir = os.path.join(settings.chroma_persist_directory, "local_index")
+        self.local_index: Optional[Union[LocalIndex, HNSWIndex]] = None
+        if settings.search_backend == "local":
+            self.local_index = LocalIndex(index_dir, precision=settings.local_index_precision)
+        elif settings.search_backend == "hnsw":
+            self.local_index = HNSWIndex(
+                index_dir,
+                connectivity=settings.hnsw_connectivity,
+                expansion_add=settings.hnsw_expansion_add,
+                expansion_search=settings.hnsw_expansion_search
+            )
+        elif settings.search_backend != "chroma":
+            raise ValueError(
+                f"Unsupported search backend {settings.search_backend}. "
+                f"Allowed values: ['chroma', 'local', 'hnsw']"
+            )
+        if self.local_index is not None:
+            self._sync_local_index()
+        
+        self.query_cache = QueryCache(
+            max_embeddings=settings.query_cache_size,
+            max_results=settings.result_cache_size,
+            ttl=settings.result_cache_ttl,
+            semantic_similarity=settings.semantic_cache_similarity
+        )
+        # Bumped after every add or delete; keys the cached index size.
+        self._writes = 0
         
+        # The encode queue, worker and semaphore are bound to the running
+        # event loop, so they are created lazily on first use.
+        self._encode_queue: Optional[asyncio.Queue] = None
+        self._encode_semaphore: Optional[asyncio.Semaphore] = None
+        self._encode_worker_task: Optional[asyncio.Task] = None
+        self._encode_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+    def _load_embedding_model(self) -> Union[SentenceTransformer, ONNXEncoder]:
+        exported = {"onnx": ONNXEncoder, "openvino": OpenVINOEncoder}
+        if settings.embedding_backend in exported:
+            self.embedding_dtype = torch.float32
+            return exported[settings.embedding_backend](
+                settings.embedding_model,
+                cache_dir=settings.embedding_export_directory,
+                quantize=settings.embedding_quantize
+            )
+        if settings.embedding_backend != "torch":
+            raise ValueError(
+                f"Unsupported embedding backend {settings.embedding_backend}. "
+                f"Allowed values: ['torch', 'onnx', 'openvino']"
+            )
+        
+        model = SentenceTransformer(settings.embedding_model, device=self.device)
+        self.embedding_dtype = self._resolve_embedding_dtype()
+        if self.embedding_dtype == torch.float32:
+            return model
+        
+        min_similarity = settings.embedding_precision_min_similarity
+        reference = self._probe_embeddings(model) if min_similarity > 0 else None
+        model.to(dtype=self.embedding_dtype)
+        if reference is None:
+            return model
+        
+        # Casting back would keep the rounded weights, so a model that drifts
+        # too far is reloaded in float32 instead.
+        similarity = float((reference * self._probe_embeddings(model)).sum(axis=1).min())
+        if similarity < min_similarity:
+            warnings.warn(
+                f"{self.embedding_dtype} embeddings drift from float32 "
+                f"(min cosine similarity {similarity:.4f} < {min_similarity}); "
+                f"falling back to float32"
+            )
+            self.embedding_dtype = torch.float32
+            model = SentenceTransformer(settings.embedding_model, device=self.device)
+        return model
+    
+    def _probe_embeddings(self, model: SentenceTransformer) -> np.ndarray:
+        with torch.inference_mode():
+            embeddings = model.encode(
+                _PRECISION_PROBES,
+                convert_to_tensor=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+        return embeddings.float().cpu().numpy()
+    
+    def _resolve_embedding_dtype(self) -> torch.dtype:
+        precision = settings.embedding_precision.lower()
+        if precision == "auto":
+            if self.device == "cuda":
+                return torch.float16
+            return torch.bfloat16 if _cpu_supports_bf16() else torch.float32
+        if precision not in _PRECISION_DTYPES:
+            raise ValueError(
+                f"Unsupported embedding precision {precision}. "
+                f"Allowed values: {['auto'] + list(_PRECISION_DTYPES)}"
+            )
+        return _PRECISION_DTYPES[precision]
+    
     def _ensure_collection(self):
+        # chromadb copies the HNSW parameters into the index segment only when
+        # the collection is created, so they are passed only then; writing them
+        # over an existing collection's metadata would misreport its index.
         try:
             self.collection = self.chroma_client.get_collection(self.collection_name)
-        except:
+        except ValueError:
             self.collection = self.chroma_client.create_collection(
                 name=self.collection_name,
-                metadata={"hnsw:space": "cosine"}
+                metadata={
+                    "hnsw:space": "cosine",
+                    "hnsw:M": settings.chroma_hnsw_m,
+                    "hnsw:construction_ef": settings.chroma_hnsw_construction_ef,
+                    "hnsw:search_ef": settings.chroma_hnsw_search_ef,
+                    "hnsw:num_threads": _NUM_THREADS
+                }
+            )
+    
+    def _migrate_legacy_chunks(self):
+        # Older chunks keep their text in Chroma's documents column and may
+        # lack document_id, which deletes filter on. Documents are written
+        # whole, so checking each document's first chunk finds them cheaply.
+        first_chunks = self.collection.get(where={"chunk_index": 0}, include=["metadatas"])
+        if all("content" in (metadata or {}) for metadata in first_chunks["metadatas"]):
+            return
+        
+        # Pages are at most Chroma's max batch size, so each one is updated
+        # as soon as it is read and only one page is held at a time.
+        for records in self._iter_records(["documents", "metadatas"]):
+            ids = []
+            metadatas = []
+            for chunk_id, document, metadata in zip(
+                records["ids"], records["documents"], records["metadatas"]
+            ):
+                metadata = metadata or {}
+                if "content" not in metadata:
+                    ids.append(chunk_id)
+                    metadatas.append({
+                        **metadata,
+                        "document_id": metadata.get("document_id") or chunk_id.rsplit("_", 1)[0],
+                        "content": document or ""
+                    })
+            if ids:
+                self.collection.update(ids=ids, metadatas=metadatas)
+    
+    def _sync_local_index(self):
+        if len(self.local_index) == self.collection.count():
+            return
+        
+        self.local_index.clear()
+        for records in self._iter_records(["embeddings"]):
+            self.local_index.add(
+                records["ids"],
+                np.asarray(records["embeddings"], dtype=np.float32)
             )
+        self.local_index.save()
+    
+    def _iter_records(self, include: List[str]):
+        # Read the whole collection a page at a time so a large knowledge
+        # base is never deserialized in one call.
+        page_size = self.chroma_client.max_batch_size
+        offset = 0
+        while True:
+            records = self.collection.get(include=include, limit=page_size, offset=offset)
+            if not records["ids"]:
+                return
+            yield records
+            offset += len(records["ids"])
     
     async def add_documents(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
         if not chunks:
             return {"status": "error", "message": "No chunks to process"}
         
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            embeddings = await loop.run_in_executor(
-                executor,
-                self._batch_encode,
-                [chunk["content"] for chunk in chunks]
-            )
-        
-        ids = [chunk["chunk_id"] for chunk in chunks]
-        documents = [chunk["content"] for chunk in chunks]
-        metadatas = [chunk["metadata"] for chunk in chunks]
-        
-        batch_size = settings.batch_size
-        for i in range(0, len(chunks), batch_size):
-            batch_ids = ids[i:i + batch_size]
-            batch_embeddings = embeddings[i:i + batch_size]
-            batch_documents = documents[i:i + batch_size]
-            batch_metadatas = metadatas[i:i + batch_size]
-            
-            self.collection.add(
-                ids=batch_ids,
-                embeddings=batch_embeddings.tolist(),
-                documents=batch_documents,
-                metadatas=batch_metadatas
-            )
+        # Each add is a separate sqlite transaction, so write in the largest
+        # batches Chroma accepts. While one batch is written on a worker
+        # thread the next is encoded; at most one write is in flight, which
+        # bounds memory to two batches of embeddings.
+        batch_size = min(settings.batch_size, self.chroma_client.max_batch_size)
+        upsert: Optional[asyncio.Future] = None
+        try:
+            for i in range(0, len(chunks), batch_size):
+                batch = chunks[i:i + batch_size]
+                embeddings = await self._encode([chunk["content"] for chunk in batch])
+                if upsert is not None:
+                    await upsert
+                upsert = asyncio.ensure_future(asyncio.to_thread(self._upsert, batch, embeddings))
+        finally:
+            # Earlier batches may already be committed even if a later one
+            # failed, so the sidecar files and cached results are brought in
+            # line with Chroma either way.
+            try:
+                if upsert is not None:
+                    await upsert
+            finally:
+                if self.local_index is not None:
+                    await asyncio.to_thread(self.local_index.save)
+                self.query_cache.invalidate_results()
+                self._writes += 1
         
         return {
             "status": "success",
@@ -66,55 +301,344 @@ class VectorStore:
             "document_id": chunks[0]["document_id"] if chunks else None
         }
     
+    def _upsert(self, chunks: List[Dict[str, Any]], embeddings: np.ndarray):
+        ids = [chunk["chunk_id"] for chunk in chunks]
+        # The text is kept in metadata rather than as a Chroma document, which
+        # would also be written to Chroma's full-text index. chromadb 0.4.x
+        # only accepts embeddings as Python lists.
+        self.collection.add(
+            ids=ids,
+            embeddings=embeddings.tolist(),
+            metadatas=[{**chunk["metadata"], "content": chunk["content"]} for chunk in chunks]
+        )
+        if self.local_index is not None:
+            self.local_index.add(ids, embeddings)
+    
+    async def _encode(self, texts: List[str]) -> np.ndarray:
+        self._bind_event_loop()
+        future = asyncio.get_running_loop().create_future()
+        await self._encode_queue.put((texts, future))
+        return await future
+    
+    def _bind_event_loop(self):
+        loop = asyncio.get_running_loop()
+        if (
+            self._encode_worker_task is None
+            or self._encode_worker_task.done()
+            or self._encode_loop is not loop
+        ):
+            self._encode_queue = asyncio.Queue()
+            self._encode_semaphore = asyncio.Semaphore(1)
+            self._encode_loop = loop
+            self._encode_worker_task = loop.create_task(self._encode_worker())
+    
+    async def _run_encode(self, texts: List[str]) -> np.ndarray:
+        self._bind_event_loop()
+        # Waiting here rather than in the pool's queue lets a cancelled
+        # request drop out before its encode starts.
+        async with self._encode_semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                _ENCODE_POOL,
+                self._batch_encode,
+                texts
+            )
+    
+    async def _encode_worker(self):
+        """Coalesce texts from concurrent add_documents calls into one encode call."""
+        window = settings.encode_coalesce_window_ms / 1000
+        
+        while True:
+            pending = [await self._encode_queue.get()]
+            total = len(pending[0][0])
+            
+            if window > 0:
+                await asyncio.sleep(window)
+            while total < settings.encode_coalesce_max_texts:
+                try:
+                    item = self._encode_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                pending.append(item)
+                total += len(item[0])
+            
+            all_texts = [text for texts, _ in pending for text in texts]
+            try:
+                embeddings = await self._run_encode(all_texts)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            start = 0
+            for texts, future in pending:
+                end = start + len(texts)
+                if not future.done():
+                    future.set_result(embeddings[start:end])
+                start = end
+    
     def _batch_encode(self, texts: List[str]) -> np.ndarray:
-        return self.embedding_model.encode(texts, show_progress_bar=True)
+        if isinstance(self.embedding_model, ONNXEncoder):
+            embeddings = self.embedding_model.encode(texts, batch_size=settings.encode_batch_size)
+            return np.ascontiguousarray(embeddings, dtype=np.float32)
+        
+        with torch.inference_mode():
+            embeddings = self.embedding_model.encode(
+                texts,
+                batch_size=settings.encode_batch_size,
+                convert_to_tensor=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+                device=self.device
+            )
+        # numpy has no bfloat16, and cosine scores downstream are computed in
+        # float32, so upcast the pooled output before leaving torch. Callers
+        # slice and index the result without copying, so keep it contiguous.
+        return np.ascontiguousarray(embeddings.float().cpu().numpy(), dtype=np.float32)
+    
+    def _normalize_query(self, query: str) -> str:
+        query = " ".join(query.split())
+        return query.lower() if self._lowercase_queries else query
+    
+    async def embed_query(self, query: str) -> np.ndarray:
+        query = self._normalize_query(query)
+        query_embedding = self.query_cache.get_embedding(query)
+        if query_embedding is None:
+            query_embedding = (await self._run_encode([query]))[0]
+            self.query_cache.put_embedding(query, query_embedding)
+        return query_embedding
+    
+    async def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """Embed several queries, encoding all cache misses in a single batch."""
+        queries = [self._normalize_query(query) for query in queries]
+        embeddings = [self.query_cache.get_embedding(query) for query in queries]
+        missing = list(dict.fromkeys(
+            query for query, embedding in zip(queries, embeddings) if embedding is None
+        ))
+        if missing:
+            encoded = await self._run_encode(missing)
+            for query, embedding in zip(missing, encoded):
+                self.query_cache.put_embedding(query, embedding)
+            fresh = dict(zip(missing, encoded))
+            embeddings = [
+                embedding if embedding is not None else fresh[query]
+                for query, embedding in zip(queries, embeddings)
+            ]
+        return embeddings
+    
+    async def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Encode arbitrary texts in one batch on the shared encode pool."""
+        return await self._run_encode(texts)
     
     async def search(
         self,
         query: str,
         max_results: int = 10,
-        similarity_threshold: float = 0.7
+        similarity_threshold: float = 0.7,
+        document_ids: Optional[List[str]] = None
+    ) -> List[SearchResult]:
+        
+        query_embedding = await self.embed_query(query)
+        
+        return await self.search_by_vector(
+            query_embedding,
+            max_results,
+            similarity_threshold,
+            document_ids
+        )
+    
+    async def batch_search(
+        self,
+        queries: List[str],
+        max_results: int = 10,
+        similarity_threshold: float = 0.7,
+        document_ids: Optional[List[str]] = None
+    ) -> List[List[SearchResult]]:
+        """Search several queries with one encode and, on Chroma, one query call."""
+        query_embeddings = await self.embed_queries(queries)
+        
+        return await self.search_by_vectors(
+            query_embeddings,
+            max_results,
+            similarity_threshold,
+            document_ids
+        )
+    
+    async def search_by_vector(
+        self,
+        query_embedding: np.ndarray,
+        max_results: int = 10,
+        similarity_threshold: float = 0.7,
+        document_ids: Optional[List[str]] = None
     ) -> List[SearchResult]:
+        results = await self.search_by_vectors(
+            [query_embedding],
+            max_results,
+            similarity_threshold,
+            document_ids
+        )
+        return results[0]
+    
+    async def search_by_vectors(
+        self,
+        query_embeddings: List[np.ndarray],
+        max_results: int = 10,
+        similarity_threshold: float = 0.7,
+        document_ids: Optional[List[str]] = None
+    ) -> List[List[SearchResult]]:
+        params = (
+            max_results,
+            similarity_threshold,
+            tuple(sorted(document_ids)) if document_ids else None
+        )
+        results = [
+            self.query_cache.get_results(query_embedding, params)
+            for query_embedding in query_embeddings
+        ]
+        missing = [i for i, cached in enumerate(results) if cached is None]
+        if not missing:
+            return results
         
-        query_embedding = self.embedding_model.encode([query])
+        generation = self.query_cache.generation
+        fresh = await asyncio.to_thread(
+            self._search_by_embeddings,
+            [query_embeddings[i] for i in missing],
+            max_results,
+            similarity_threshold,
+            document_ids
+        )
+        for i, search_results in zip(missing, fresh):
+            self.query_cache.put_results(query_embeddings[i], params, search_results, generation)
+            results[i] = search_results
+        
+        return results
+    
+    def _search_by_embeddings(
+        self,
+        query_embeddings: List[np.ndarray],
+        max_results: int,
+        similarity_threshold: float,
+        document_ids: Optional[List[str]] = None
+    ) -> List[List[SearchResult]]:
+        # The local indexes hold no metadata, so scoped searches go to Chroma,
+        # which applies the document_id filter before ranking.
+        if self.local_index is not None and not document_ids:
+            return [
+                self._search_local(query_embedding, max_results, similarity_threshold)
+                for query_embedding in query_embeddings
+            ]
         
         results = self.collection.query(
-            query_embeddings=query_embedding.tolist(),
-            n_results=max_results
+            query_embeddings=[query_embedding.tolist() for query_embedding in query_embeddings],
+            n_results=max_results,
+            where={"document_id": {"$in": document_ids}} if document_ids else None,
+            include=["metadatas", "distances"]
         )
         
         search_results = []
-        for i, (doc_id, document, metadata, distance) in enumerate(
-            zip(results["ids"][0], results["documents"][0], 
-                results["metadatas"][0], results["distances"][0])
+        for ids, metadatas, distances in zip(
+            results["ids"], results["metadatas"], results["distances"]
         ):
-            similarity_score = 1 - distance
+            similarities = 1.0 - np.asarray(distances, dtype=np.float64)
+            search_results.append([
+                self._to_search_result(ids[i], metadatas[i], float(similarities[i]))
+                for i in np.flatnonzero(similarities >= similarity_threshold)
+            ])
+        
+        return search_results
+    
+    def _search_local(
+        self,
+        query_embedding: np.ndarray,
+        max_results: int,
+        similarity_threshold: float
+    ) -> List[SearchResult]:
+        if self.local_index.exact:
+            top_ids, scores = self.local_index.search(query_embedding, max_results)
+            hits = [
+                (chunk_id, float(score))
+                for chunk_id, score in zip(top_ids, scores)
+                if score >= similarity_threshold
+            ]
+            if not hits:
+                return []
             
+            records = self.collection.get(
+                ids=[chunk_id for chunk_id, _ in hits],
+                include=["metadatas"]
+            )
+            rows = dict(zip(records["ids"], records["metadatas"]))
+            return [
+                self._to_search_result(chunk_id, rows[chunk_id], score)
+                for chunk_id, score in hits
+                if chunk_id in rows
+            ]
+        
+        # Quantized scores are approximate: shortlist extra candidates and
+        # rescore them against the float32 vectors stored in Chroma.
+        candidate_ids, _ = self.local_index.search(
+            query_embedding,
+            max_results * settings.rescore_multiplier
+        )
+        if not candidate_ids:
+            return []
+        
+        records = self.collection.get(
+            ids=candidate_ids,
+            include=["embeddings", "metadatas"]
+        )
+        if not records or not records.get("ids"):
+            return []
+        
+        # Query embeddings are unit length; stored rows may predate
+        # normalize_embeddings, so only they are normalized here.
+        embeddings = np.asarray(records["embeddings"], dtype=np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        similarities = embeddings @ query_embedding
+        
+        search_results = []
+        for i in np.argsort(-similarities)[:max_results]:
+            similarity_score = float(similarities[i])
             if similarity_score >= similarity_threshold:
-                search_results.append(SearchResult(
-                    document_id=metadata.get("document_id", ""),
-                    filename=metadata.get("filename", ""),
-                    chunk_id=doc_id,
-                    content=document,
-                    similarity_score=similarity_score,
-                    metadata=metadata
+                search_results.append(self._to_search_result(
+                    records["ids"][i],
+                    records["metadatas"][i],
+                    similarity_score
                 ))
         
         return search_results
     
+    def _to_search_result(
+        self,
+        chunk_id: str,
+        metadata: Dict[str, Any],
+        similarity_score: float
+    ) -> SearchResult:
+        # Rows come from our own index: ingest and the start-up migration
+        # guarantee these keys, so skip defaults and pydantic validation.
+        metadata = dict(metadata)
+        return SearchResult.model_construct(
+            document_id=metadata["document_id"],
+            filename=metadata["filename"],
+            chunk_id=chunk_id,
+            content=metadata.pop("content"),
+            similarity_score=similarity_score,
+            metadata=metadata
+        )
+    
     async def delete_document(self, document_id: str) -> Dict[str, Any]:
-        # Get all chunks and filter by document_id prefix in chunk_id
-        all_results = self.collection.get()
-        
-        chunks_to_delete = []
-        if all_results and all_results.get("ids"):
-            for chunk_id in all_results["ids"]:
-                # Check if chunk_id starts with document_id followed by underscore
-                if chunk_id.startswith(f"{document_id}_"):
-                    chunks_to_delete.append(chunk_id)
+        chunks_to_delete = self.collection.get(
+            where={"document_id": document_id},
+            include=[]
+        )["ids"]
         
         if chunks_to_delete:
             self.collection.delete(ids=chunks_to_delete)
+            if self.local_index is not None:
+                self.local_index.remove(chunks_to_delete)
+                self.local_index.save()
+            self.query_cache.invalidate_results()
+            self._writes += 1
             
         return {
             "document_id": document_id,
@@ -128,11 +652,13 @@ class VectorStore:
     def get_index_stats(self) -> Dict[str, Any]:
         count = self.collection.count()
         
-        persist_dir_size = 0
-        for dirpath, dirnames, filenames in os.walk(settings.chroma_persist_directory):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                persist_dir_size += os.path.getsize(filepath)
+        # Walking the persist directory stats every segment file, so the total
+        # is only recomputed after this store wrote to the index or files were
+        # added or removed at the top level. The chunk count alone misses a
+        # delete followed by an add of the same size, and segment files grow
+        # inside subdirectories without touching the top-level mtime.
+        path = settings.chroma_persist_directory
+        persist_dir_size = _dir_size(path, os.stat(path).st_mtime_ns, self._writes)
         
         return {
             "total_chunks": count,
@@ -141,28 +667,18 @@ class VectorStore:
         }
     
     def get_all_documents(self) -> List[Dict[str, Any]]:
-        all_data = self.collection.get()
-        
-        if not all_data or not all_data.get("ids"):
-            return []
+        # Chunk metadata carries the chunk text, so only each document's
+        # first chunk is fetched; it records how many chunks there are.
+        first_chunks = self.collection.get(where={"chunk_index": 0}, include=["metadatas"])
         
-        documents = {}
-        
-        for i, (chunk_id, metadata) in enumerate(zip(all_data["ids"], all_data["metadatas"])):
-            if not metadata:
-                continue
-                
-            document_id = chunk_id.rsplit("_", 1)[0] if chunk_id else None
-            
-            if document_id:
-                if document_id not in documents:
-                    documents[document_id] = {
-                        "document_id": document_id,
-                        "filename": metadata.get("filename", ""),
-                        "document_type": metadata.get("document_type", ""),
-                        "created_at": metadata.get("created_at", ""),
-                        "chunk_count": 0
-                    }
-                documents[document_id]["chunk_count"] += 1
-        
-        return list(documents.values())
\ No newline at end of file
+        return [
+            {
+                "document_id": metadata["document_id"],
+                "filename": metadata.get("filename", ""),
+                "document_type": metadata.get("document_type", ""),
+                "created_at": metadata.get("created_at", ""),
+                "chunk_count": metadata.get("total_chunks", 0)
+            }
+            for metadata in first_chunks["metadatas"]
+            if metadata
+        ]
@@ -103,14 +103,13 @@ def demo_search():
         "data visualization techniques"
     ]
     
-    for query in queries:
-        response = requests.post(
-            f"{API_BASE_URL}/search",
-            json={"query": query, "max_results": 3}
-        )
-        
-        if response.status_code == 200:
-            results = response.json()
+    response = requests.post(
+        f"{API_BASE_URL}/search/batch",
+        json={"queries": queries, "max_results": 3}
+    )
+    
+    if response.status_code == 200:
+        for query, results in zip(queries, response.json()):
             print(f"\nQuery: '{query}'")
             print(f"Found {len(results)} results:")
             for i, result in enumerate(results[:2], 1):
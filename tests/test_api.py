@@ -1,8 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
 import os
+import asyncio
 import tempfile
 from app.main import app
+from app.api.routes import vector_store
+from app.core.config import settings
 import warnings
 
 # Suppress telemetry warnings
@@ -41,6 +44,52 @@ def test_upload_document(sample_text_file):
     assert data["chunks_processed"] > 0
     assert data["filename"] == "test.txt"
 
+def test_upload_documents_batch(sample_text_file):
+    with open(sample_text_file, 'rb') as f:
+        content = f.read()
+    
+    response = client.post(
+        "/api/v1/documents/upload-batch",
+        files=[
+            ("files", ("batch_a.txt", content, "text/plain")),
+            ("files", ("batch_b.txt", content + b" Extra text.", "text/plain")),
+            ("files", ("batch_c.exe", b"binary", "application/octet-stream"))
+        ]
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["filename"] for item in data] == ["batch_a.txt", "batch_b.txt", "batch_c.exe"]
+    assert [item["status"] for item in data] == ["success", "success", "failed"]
+    assert data[2]["metadata"] is None
+
+def test_upload_documents_batch_same_filename(monkeypatch):
+    # Parse from disk, where same-named uploads would share a path
+    monkeypatch.setattr(settings, "inline_parse_max_bytes", 0)
+    first = b"Gradient descent updates model weights step by step."
+    second = b"Photosynthesis converts sunlight into chemical energy in plants."
+    
+    response = client.post(
+        "/api/v1/documents/upload-batch",
+        files=[
+            ("files", ("same_name.txt", first, "text/plain")),
+            ("files", ("same_name.txt", second, "text/plain"))
+        ]
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["status"] for item in data] == ["success", "success"]
+    assert data[0]["id"] != data[1]["id"]
+    
+    for item, content in zip(data, (first, second)):
+        chunks = vector_store.collection.get(
+            where={"document_id": item["id"]},
+            include=["metadatas"]
+        )["metadatas"]
+        assert chunks[0]["content"] == content.decode()
+        client.delete(f"/api/v1/documents/{item['id']}")
+
 def test_search_documents():
     response = client.post(
         "/api/v1/search",
@@ -53,6 +102,25 @@ def test_search_documents():
     assert response.status_code == 200
     assert isinstance(response.json(), list)
 
+def test_search_documents_batch():
+    response = client.post(
+        "/api/v1/search/batch",
+        json={
+            "queries": ["machine learning", "neural networks"],
+            "max_results": 5
+        }
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 2
+    assert all(isinstance(results, list) for results in data)
+
+def test_search_documents_batch_limits():
+    for queries in ([], ["query"] * 51):
+        response = client.post("/api/v1/search/batch", json={"queries": queries})
+        assert response.status_code == 422
+
 def test_ask_question():
     response = client.post(
         "/api/v1/qa/ask",
@@ -83,6 +151,58 @@ def test_completeness_check():
     assert "results" in data
     assert "recommendations" in data
 
+def test_completeness_check_scoped_to_documents():
+    response = client.post(
+        "/api/v1/qa/completeness",
+        json={
+            "topics": ["machine learning"],
+            "document_ids": ["nonexistent_document_id"]
+        }
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["results"][0]["relevant_chunks"] == []
+    assert data["results"][0]["coverage_score"] == 0.0
+
+def test_failed_add_invalidates_cached_results(monkeypatch):
+    chunks = [
+        {
+            "document_id": "partial_add_doc",
+            "chunk_id": f"partial_add_doc_{i}",
+            "content": f"Partially indexed chunk number {i}.",
+            "metadata": {
+                "document_id": "partial_add_doc",
+                "filename": "partial.txt",
+                "chunk_index": i,
+                "total_chunks": 2
+            }
+        }
+        for i in range(2)
+    ]
+    encode = vector_store._encode
+    calls = []
+    
+    async def failing_encode(texts):
+        calls.append(texts)
+        if len(calls) == 2:
+            raise RuntimeError("encoder failed")
+        return await encode(texts)
+    
+    monkeypatch.setattr(settings, "batch_size", 1)
+    monkeypatch.setattr(vector_store, "_encode", failing_encode)
+    generation = vector_store.query_cache.generation
+    
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(vector_store.add_documents(chunks))
+        
+        # The first batch is committed, so results cached before it are stale
+        assert vector_store.query_cache.generation > generation
+        assert len(vector_store.collection.get(where={"document_id": "partial_add_doc"}, include=[])["ids"]) == 1
+    finally:
+        asyncio.run(vector_store.delete_document("partial_add_doc"))
+
 def test_index_status():
     response = client.get("/api/v1/index/status")
     assert response.status_code == 200
@@ -91,6 +211,29 @@ def test_index_status():
     assert "total_chunks" in data
     assert "index_size_mb" in data
 
+def test_index_size_tracks_writes():
+    import shutil
+    
+    # Segment files grow inside subdirectories without changing the
+    # persist directory's own mtime
+    segment_dir = os.path.join(settings.chroma_persist_directory, "size_probe_segment")
+    os.makedirs(segment_dir, exist_ok=True)
+    try:
+        before = client.get("/api/v1/index/status").json()["index_size_mb"]
+        with open(os.path.join(segment_dir, "data.bin"), "wb") as f:
+            f.write(b"\0" * (1 << 20))
+        
+        upload = client.post(
+            "/api/v1/documents/upload",
+            files={"file": ("size_probe.txt", b"Index size probe document.", "text/plain")}
+        ).json()
+        client.delete(f"/api/v1/documents/{upload['id']}")
+        
+        after = client.get("/api/v1/index/status").json()["index_size_mb"]
+        assert after - before >= 1.0
+    finally:
+        shutil.rmtree(segment_dir)
+
 def test_delete_document(sample_text_file):
     import time
     import uuid
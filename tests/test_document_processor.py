@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.document_processor import DocumentProcessor
+
+
+@pytest.fixture
+def processor():
+    processor = DocumentProcessor()
+    processor.chunk_size = 4
+    processor.chunk_overlap = 1
+    return processor
+
+
+def test_chunks_keep_original_whitespace(processor):
+    text = "First  line\nsecond\tline here\n\nthird paragraph  ends"
+
+    chunks = processor._chunk_text(text)
+
+    assert chunks == [
+        "First  line\nsecond\tline",
+        "line here\n\nthird paragraph",
+        "paragraph  ends"
+    ]
+    # Every chunk is a verbatim slice of the source text
+    assert all(chunk in text for chunk in chunks)
+
+
+def test_chunk_boundaries_follow_words(processor):
+    words = [f"w{i}" for i in range(10)]
+
+    chunks = processor._chunk_text("  " + " ".join(words) + "  ")
+
+    assert [chunk.split() for chunk in chunks] == [
+        words[0:4], words[3:7], words[6:10], words[9:10]
+    ]
+    assert all(chunk == chunk.strip() for chunk in chunks)
+
+
+@pytest.mark.parametrize("text", ["", "   \n\t  "])
+def test_empty_text_has_no_chunks(processor, text):
+    assert processor._chunk_text(text) == []
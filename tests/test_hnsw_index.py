@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("usearch")
+
+from app.services.hnsw_index import HNSWIndex
+
+
+def _embeddings(count=200, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((count, dim)).astype(np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def _ids(count, offset=0):
+    return [f"doc_{i}" for i in range(offset, offset + count)]
+
+
+def test_add_and_search(tmp_path):
+    embeddings = _embeddings()
+    index = HNSWIndex(str(tmp_path))
+    index.add(_ids(len(embeddings)), embeddings)
+
+    assert len(index) == len(embeddings)
+    for i in range(0, len(embeddings), 20):
+        ids, scores = index.search(embeddings[i], 3)
+        assert ids[0] == f"doc_{i}"
+        assert scores[0] == pytest.approx(1.0, abs=1e-2)
+
+
+def test_add_ignores_existing_ids(tmp_path):
+    embeddings = _embeddings(count=10)
+    index = HNSWIndex(str(tmp_path))
+    index.add(_ids(10), embeddings)
+    index.add(["doc_0", "doc_10"], embeddings[:2])
+
+    assert len(index) == 11
+
+
+def test_remove(tmp_path):
+    embeddings = _embeddings(count=50)
+    index = HNSWIndex(str(tmp_path))
+    index.add(_ids(50), embeddings)
+
+    assert index.remove(["doc_3", "missing"]) == 1
+    assert index.remove(["doc_3"]) == 0
+    assert len(index) == 49
+    ids, _ = index.search(embeddings[3], 10)
+    assert "doc_3" not in ids
+
+
+def test_save_and_restore(tmp_path):
+    embeddings = _embeddings(count=60)
+    index = HNSWIndex(str(tmp_path))
+    index.add(_ids(50), embeddings[:50])
+    index.remove(["doc_7"])
+    index.save()
+
+    restored = HNSWIndex(str(tmp_path))
+    assert len(restored) == 49
+    ids, _ = restored.search(embeddings[8], 1)
+    assert ids == ["doc_8"]
+
+    # New keys continue after the restored ones rather than reusing them
+    restored.add(_ids(10, offset=50), embeddings[50:])
+    assert len(restored) == 59
+    ids, _ = restored.search(embeddings[55], 1)
+    assert ids == ["doc_55"]
+    ids, _ = restored.search(embeddings[8], 1)
+    assert ids == ["doc_8"]
+
+
+def test_clear(tmp_path):
+    index = HNSWIndex(str(tmp_path))
+    index.add(_ids(5), _embeddings(count=5))
+    index.save()
+    index.clear()
+
+    assert len(index) == 0
+    assert index.search(_embeddings(count=1)[0], 3)[0] == []
+    assert len(HNSWIndex(str(tmp_path))) == 0
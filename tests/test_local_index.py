@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.services.local_index import LocalIndex
+
+PRECISIONS = ["float32", "float16", "int8", "binary"]
+
+
+def _embeddings(count=200, dim=128, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((count, dim)).astype(np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def _ids(count):
+    return [f"doc_{i}" for i in range(count)]
+
+
+@pytest.mark.parametrize("precision", PRECISIONS)
+def test_top1_recall(tmp_path, precision):
+    embeddings = _embeddings()
+    index = LocalIndex(str(tmp_path), precision)
+    index.add(_ids(len(embeddings)), embeddings)
+
+    noise = np.random.default_rng(1).standard_normal(embeddings.shape).astype(np.float32) * 0.01
+    for i in range(0, len(embeddings), 10):
+        ids, scores = index.search(embeddings[i] + noise[i], 3)
+        assert ids[0] == f"doc_{i}"
+        assert scores[0] >= scores[1] >= scores[2]
+
+
+@pytest.mark.parametrize("precision", ["float32", "float16"])
+def test_exact_precisions_return_cosine_scores(tmp_path, precision):
+    embeddings = _embeddings()
+    index = LocalIndex(str(tmp_path), precision)
+    index.add(_ids(len(embeddings)), embeddings)
+
+    ids, scores = index.search(embeddings[5] * 3.0, 1)
+    assert index.exact
+    assert ids == ["doc_5"]
+    assert scores[0] == pytest.approx(1.0, abs=1e-3)
+
+
+def test_add_ignores_existing_ids(tmp_path):
+    embeddings = _embeddings(count=10)
+    index = LocalIndex(str(tmp_path))
+    index.add(_ids(10), embeddings)
+    index.add(["doc_0", "doc_10"], embeddings[:2])
+
+    assert len(index) == 11
+
+
+@pytest.mark.parametrize("precision", PRECISIONS)
+def test_remove_then_reload(tmp_path, precision):
+    embeddings = _embeddings(count=50)
+    index = LocalIndex(str(tmp_path), precision)
+    index.add(_ids(50), embeddings)
+
+    assert index.remove(["doc_3", "doc_7", "missing"]) == 2
+    assert index.remove(["doc_3"]) == 0
+    index.save()
+
+    reloaded = LocalIndex(str(tmp_path), precision)
+    assert len(reloaded) == 48
+    assert "doc_3" not in reloaded.ids and "doc_7" not in reloaded.ids
+    ids, _ = reloaded.search(embeddings[8], 1)
+    assert ids == ["doc_8"]
+    ids, _ = reloaded.search(embeddings[3], 50)
+    assert "doc_3" not in ids
+
+
+@pytest.mark.parametrize("precision", PRECISIONS)
+def test_reload_starts_empty_when_ids_and_matrix_disagree(tmp_path, precision):
+    embeddings = _embeddings(count=20)
+    index = LocalIndex(str(tmp_path), precision)
+    index.add(_ids(20), embeddings)
+    index.save()
+
+    # Simulate a crash after rows were appended but before the ids were saved
+    index.add(["doc_20"], embeddings[:1])
+
+    reloaded = LocalIndex(str(tmp_path), precision)
+    assert len(reloaded) == 0
+    ids, scores = reloaded.search(embeddings[0], 5)
+    assert ids == [] and len(scores) == 0
+
+    with open(reloaded.ids_path, "r", encoding="utf-8") as f:
+        assert len(json.load(f)["ids"]) == 20
+
+
+def test_clear(tmp_path):
+    index = LocalIndex(str(tmp_path))
+    index.add(_ids(5), _embeddings(count=5))
+    index.clear()
+    index.save()
+
+    assert len(index) == 0
+    assert len(LocalIndex(str(tmp_path))) == 0
+
+
+def test_unsupported_precision(tmp_path):
+    with pytest.raises(ValueError):
+        LocalIndex(str(tmp_path), "int4")
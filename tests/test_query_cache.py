@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from app.models.schemas import SearchResult
+from app.services.query_cache import QueryCache
+
+PARAMS = (10, 0.7, None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _results(name):
+    return [
+        SearchResult(
+            document_id=name,
+            filename=f"{name}.txt",
+            chunk_id=f"{name}_0",
+            content="content",
+            similarity_score=0.9,
+            metadata={}
+        )
+    ]
+
+
+def test_exact_hit_returns_copy(clock):
+    cache = QueryCache(clock=clock)
+    embedding = _unit([1.0, 0.0, 0.0])
+    results = _results("a")
+    cache.put_results(embedding, PARAMS, results, cache.generation)
+
+    cached = cache.get_results(embedding, PARAMS)
+    assert cached == results
+    cached.clear()
+    assert cache.get_results(embedding, PARAMS) == results
+
+
+def test_results_expire_after_ttl(clock):
+    cache = QueryCache(ttl=60.0, clock=clock)
+    embedding = _unit([1.0, 0.0, 0.0])
+    cache.put_results(embedding, PARAMS, _results("a"), cache.generation)
+
+    clock.now += 59.0
+    assert cache.get_results(embedding, PARAMS) is not None
+    clock.now += 1.0
+    assert cache.get_results(embedding, PARAMS) is None
+
+
+def test_semantic_hit_at_threshold(clock):
+    cache = QueryCache(semantic_similarity=0.97, clock=clock)
+    cached_embedding = _unit([1.0, 0.0])
+    cache.put_results(cached_embedding, PARAMS, _results("a"), cache.generation)
+
+    # Queries just above and just below the similarity threshold
+    near = _unit([np.cos(np.arccos(0.97) - 1e-3), np.sin(np.arccos(0.97) - 1e-3)])
+    far = _unit([np.cos(np.arccos(0.97) + 1e-3), np.sin(np.arccos(0.97) + 1e-3)])
+    assert cache.get_results(near, PARAMS) == _results("a")
+    assert cache.get_results(far, PARAMS) is None
+
+
+def test_semantic_hit_requires_same_params(clock):
+    cache = QueryCache(semantic_similarity=0.97, clock=clock)
+    embedding = _unit([1.0, 0.0])
+    cache.put_results(embedding, PARAMS, _results("a"), cache.generation)
+
+    assert cache.get_results(embedding, (5, 0.7, None)) is None
+    assert cache.get_results(_unit([1.0, 0.01]), (10, 0.7, ("doc",))) is None
+
+
+def test_stale_generation_is_not_written_back(clock):
+    cache = QueryCache(clock=clock)
+    embedding = _unit([1.0, 0.0])
+    generation = cache.generation
+
+    # The index changes while a search is in flight
+    cache.invalidate_results()
+    cache.put_results(embedding, PARAMS, _results("stale"), generation)
+    assert cache.get_results(embedding, PARAMS) is None
+
+    cache.put_results(embedding, PARAMS, _results("fresh"), cache.generation)
+    assert cache.get_results(embedding, PARAMS) == _results("fresh")
+
+
+def test_invalidate_drops_results_but_keeps_embeddings(clock):
+    cache = QueryCache(clock=clock)
+    embedding = _unit([1.0, 0.0])
+    cache.put_embedding("query", embedding)
+    cache.put_results(embedding, PARAMS, _results("a"), cache.generation)
+
+    cache.invalidate_results()
+    assert cache.get_results(embedding, PARAMS) is None
+    assert cache.get_embedding("query") is embedding
+
+
+def test_lru_eviction(clock):
+    cache = QueryCache(max_embeddings=2, max_results=2, semantic_similarity=1.1, clock=clock)
+    embeddings = [_unit(v) for v in ([1.0, 0.0], [0.0, 1.0], [1.0, 1.0])]
+
+    cache.put_embedding("a", embeddings[0])
+    cache.put_embedding("b", embeddings[1])
+    cache.get_embedding("a")
+    cache.put_embedding("c", embeddings[2])
+    assert cache.get_embedding("b") is None
+    assert cache.get_embedding("a") is not None
+
+    for i, embedding in enumerate(embeddings):
+        cache.put_results(embedding, PARAMS, _results(str(i)), cache.generation)
+    assert cache.get_results(embeddings[0], PARAMS) is None
+    assert cache.get_results(embeddings[2], PARAMS) == _results("2")
+
+
+def test_disabled_cache(clock):
+    cache = QueryCache(max_embeddings=0, max_results=0, clock=clock)
+    embedding = _unit([1.0, 0.0])
+    cache.put_embedding("query", embedding)
+    cache.put_results(embedding, PARAMS, _results("a"), cache.generation)
+
+    assert cache.get_embedding("query") is None
+    assert cache.get_results(embedding, PARAMS) is None